@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial, wraps
 import os
-import requests
+import re
+import threading
+import time
 from dotenv import load_dotenv
-from collections import defaultdict
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from datagen_sdk import DatagenClient, DatagenError, DatagenAuthError
+from disk_cache import disk_cached, get_cache as get_disk_cache
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +26,16 @@ st.set_page_config(
     layout="wide"
 )
 
+# Shared chart defaults, layered on top of Streamlit's plotly theme
+@st.cache_resource
+def register_plotly_template():
+    """Register the dashboard's plotly template once per process"""
+    pio.templates["posthog"] = go.layout.Template(layout=dict(height=400, hovermode='x unified'))
+    pio.templates.default = "streamlit+posthog"
+
+
+register_plotly_template()
+
 # DataGen API configuration
 DATAGEN_API_KEY = os.getenv("DATAGEN_API_KEY")
 
@@ -31,104 +48,382 @@ def get_datagen_client():
     return DatagenClient(api_key=DATAGEN_API_KEY)
 
 
+# Errors and warnings reported inside fetch_concurrently workers are queued here and shown by the
+# script thread, so they render in a fixed place instead of from background threads
+_worker_state = threading.local()
+
+# Set while computing a cache_fetched_data result that must not be stored (stale or built from one)
+_fetch_state = threading.local()
+
+
+def _report(kind, message):
+    pending = getattr(_worker_state, "messages", None)
+    if pending is None:
+        getattr(st, kind)(message)
+    else:
+        pending.append((kind, message))
+
+
+def report_error(message):
+    """Show an error, deferring it to the script thread when called from a fetch worker"""
+    _report("error", message)
+
+
+def report_stale(stored_at):
+    """Warn that a failed query is being served from an expired disk cache entry"""
+    # Keeps the expired value, and anything built from it, out of the in-memory caches
+    _fetch_state.uncached = True
+    _report("warning", f"Showing cached data from {datetime.fromtimestamp(stored_at):%Y-%m-%d %H:%M} "
+                       f"because PostHog could not be reached")
+
+
 def call_datagen_tool(tool_name, parameters):
     """Call DataGen MCP tool using the SDK"""
     client = get_datagen_client()
 
     if not client:
-        st.error("DATAGEN_API_KEY not found. Please set it in your .env file.")
+        report_error("DATAGEN_API_KEY not found. Please set it in your .env file.")
         return None
 
     try:
         result = client.execute_tool(tool_name, parameters)
         return result
     except DatagenAuthError as e:
-        st.error(f"Authentication Error: {str(e)}\n\nPlease check your DATAGEN_API_KEY or MCP server configuration.")
+        report_error(f"Authentication Error: {str(e)}\n\nPlease check your DATAGEN_API_KEY or MCP server configuration.")
         return None
     except DatagenError as e:
-        st.error(f"Error calling DataGen tool '{tool_name}': {str(e)}")
+        report_error(f"Error calling DataGen tool '{tool_name}': {str(e)}")
         return None
     except Exception as e:
-        st.error(f"Unexpected error: {str(e)}")
+        report_error(f"Unexpected error: {str(e)}")
         return None
 
 
+class _UncachedResult(Exception):
+    """Carries a result out of st.cache_data without it being stored (exceptions are never cached)"""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+# Failed and stale results are kept this many seconds before PostHog is tried again
+FAILURE_TTL = 30
+
+
+@st.cache_resource
+def get_recent_failures():
+    """Process-wide (function, arguments) -> (expires_at, value, messages) of recently failed or stale fetches"""
+    return {}
+
+
+def cache_fetched_data(**cache_kwargs):
+    """st.cache_data that keeps successful, fresh results only
+
+    A None result means the query failed and its error was already reported; a stale
+    result was served from an expired disk entry (see report_stale). Neither is stored
+    in st.cache_data. Results built from an uncached one, such as a loader parsing a
+    stale fetch, are not stored either.
+
+    Both are instead kept for FAILURE_TTL seconds together with the errors and stale
+    warnings they reported, which are replayed on every rerun. An outage then costs one
+    timeout per FAILURE_TTL rather than one per widget interaction.
+    """
+    def decorator(func):
+        @wraps(func)
+        def compute(*args, **kwargs):
+            _fetch_state.uncached = False
+            value = func(*args, **kwargs)
+            if value is None or _fetch_state.uncached:
+                raise _UncachedResult(value)
+            return value
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            failures = get_recent_failures()
+            key = (func.__qualname__, repr(args), repr(sorted(kwargs.items())))
+            failure = failures.get(key)
+            if failure is not None and time.monotonic() < failure[0]:
+                _, value, messages = failure
+                _fetch_state.uncached = True
+                for kind, message in messages:
+                    _report(kind, message)
+                return value
+
+            # Restored afterwards, so an enclosing computation sees whether this result was cached
+            uncached = getattr(_fetch_state, "uncached", False)
+            # Capture what this call reports, so a failure can replay it
+            pending = getattr(_worker_state, "messages", None)
+            _worker_state.messages = messages = []
+            try:
+                return cached(*args, **kwargs)
+            except _UncachedResult as result:
+                uncached = True
+                failures[key] = (time.monotonic() + FAILURE_TTL, result.value, messages)
+                return result.value
+            finally:
+                _fetch_state.uncached = uncached
+                _worker_state.messages = pending
+                for kind, message in messages:
+                    _report(kind, message)
+
+        def clear():
+            cached.clear()
+            failures = get_recent_failures()
+            for key in [key for key in failures if key[0] == func.__qualname__]:
+                failures.pop(key, None)
+
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
+
+
+@st.cache_resource
+def get_executor():
+    """Initialize and cache the thread pool used for concurrent DataGen calls"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def fetch_concurrently(*fetchers):
+    """Run independent fetch functions in parallel and return their results in order"""
+    ctx = get_script_run_ctx()
+
+    def run(fetcher):
+        # Attach the session's context so st.cache_data works in the worker
+        add_script_run_ctx(ctx=ctx)
+        _worker_state.messages = []
+        try:
+            return fetcher(), _worker_state.messages
+        finally:
+            _worker_state.messages = None
+
+    futures = [get_executor().submit(run, fetcher) for fetcher in fetchers]
+    outcomes = [future.result() for future in futures]
+
+    # Drain worker messages on the script thread, once per distinct message
+    for kind, message in dict.fromkeys(m for _, messages in outcomes for m in messages):
+        getattr(st, kind)(message)
+
+    return [result for result, _ in outcomes]
+
+
+# Matches "key: value" lines in the text payloads returned by the PostHog MCP
+# tools, e.g. "  name: TypeError" or "  data[30]: 1,2,3"
+FIELD_RE = re.compile(r'^[ \t]*(?:- )?([A-Za-z_$][\w$]*)(?:\[\d*\])?(?:\{[^}\n]*\})?:[ \t]*(.*)$', re.MULTILINE)
+
+# Match the data/labels arrays of a trends series, e.g. "  data[30]: 1,2,3"
+TREND_DATA_RE = re.compile(r'^[ \t]*(?:- )?data\[\d*\]:[ \t]*(.*)$', re.MULTILINE)
+TREND_LABELS_RE = re.compile(r'^[ \t]*(?:- )?labels\[\d*\]:[ \t]*(.*)$', re.MULTILINE)
+
+# Match the label and count of a breakdown item, e.g. "  label: Germany" / "  count: 12"
+BREAKDOWN_LABEL_RE = re.compile(r'^[ \t]*(?:- )?label:[ \t]*(.*)$', re.MULTILINE)
+BREAKDOWN_COUNT_RE = re.compile(r'^[ \t]*(?:- )?count:[ \t]*(.*)$', re.MULTILINE)
+
+# Matches positional HogQL result rows, e.g. '  - [3]: 2025-11-21,271,7'
+HOGQL_ROW_RE = re.compile(r' - \[\d+\]: ([^\n]+)')
+
+ERROR_FIELDS = (
+    'id', 'name', 'description', 'source', 'status',
+    'occurrences', 'users', 'sessions', 'first_seen', 'last_seen'
+)
+
+# Shown in place of fields an error payload did not include
+ERROR_DEFAULTS = {
+    'id': 'N/A', 'name': 'Unknown Error', 'description': '', 'source': 'N/A', 'status': 'N/A',
+    'first_seen': '', 'last_seen': ''
+}
+
+
+def parse_fields(item):
+    """Parse a tool result string into a dict of its first-seen fields in a single pass"""
+    fields = {}
+    for match in FIELD_RE.finditer(item):
+        fields.setdefault(match.group(1), match.group(2).strip())
+    return fields
+
+
+def parse_trend_series(item):
+    """Return the raw (data, labels) text of a trends payload, or None if either is missing"""
+    data = TREND_DATA_RE.search(item)
+    labels = TREND_LABELS_RE.search(item)
+    if data is None or labels is None:
+        return None
+    return data.group(1).strip(), labels.group(1).strip()
+
+
+def parse_counts(text):
+    """Parse a comma-separated series of numbers; tokens such as null or empty fields become NaN"""
+    tokens = [token.strip() for token in text.split(",")] if text else []
+    return pd.to_numeric(pd.Series(tokens, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def normalize_date_labels(labels, fmt='%d-%b-%Y'):
+    """Reformat date labels such as '20-Nov-2025' to ISO dates, keeping unparseable labels as-is"""
+    labels = np.asarray(labels, dtype=object)
+    parsed = pd.to_datetime(labels, format=fmt, errors='coerce')
+    return np.where(parsed.isna(), labels, parsed.strftime('%Y-%m-%d'))
+
+
+# ===== CHART HELPERS =====
+
+# Line traces longer than this are downsampled before being sent to the browser
+MAX_CHART_POINTS = 1500
+# Markers are dropped above this many points; they dominate the SVG node count
+MAX_MARKER_POINTS = 200
+
+
+def lttb_indices(values, n_out):
+    """Pick the indices of n_out points that best preserve the shape of a series (LTTB)
+
+    The first and last points are always kept, so at least two indices are returned.
+    """
+    n = len(values)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    y = np.asarray(values, dtype=float)
+    # Bucket i spans [edges[i], edges[i + 1]); integer division keeps the bounds exact where
+    # linspace(...).astype(int) would round some of them down by one
+    edges = 1 + np.arange(n_out - 1) * (n - 2) // (n_out - 2)
+    indices = np.zeros(n_out, dtype=int)
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = (edges[i + 1] + edges[i + 2] - 1) / 2
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = n - 1, y[-1]
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        candidates = np.arange(start, end)
+        areas = np.abs(
+            (selected - next_x) * (y[start:end] - y[selected])
+            - (selected - candidates) * (next_y - y[selected])
+        )
+        selected = start + int(areas.argmax())
+        indices[i + 1] = selected
+
+    return indices
+
+
+def plot_line_chart(fig):
+    """Downsample long line traces, then render the figure"""
+    for trace in fig.data:
+        if trace.y is None or len(trace.y) <= MAX_MARKER_POINTS:
+            continue
+        if trace.mode and 'markers' in trace.mode:
+            trace.mode = 'lines'
+        if len(trace.y) > MAX_CHART_POINTS:
+            keep = lttb_indices(trace.y, MAX_CHART_POINTS)
+            trace.x = np.asarray(trace.x)[keep]
+            trace.y = np.asarray(trace.y)[keep]
+
+    st.plotly_chart(fig, width='stretch', config={'responsive': True})
+
+
+# ===== TABLE HELPERS =====
+
+COUNT_COLUMN = st.column_config.NumberColumn(format="%d")
+AVERAGE_COLUMN = st.column_config.NumberColumn(format="%.2f")
+
+# Tables with more cells than this are only sent to the browser on request
+MAX_EAGER_TABLE_CELLS = 500
+
+
+def show_table(df, column_config=None, key=None):
+    """Render a typed, index-free table; large ones wait behind a "Show full table" toggle"""
+    if key and df.size > MAX_EAGER_TABLE_CELLS and not st.toggle("Show full table", key=key):
+        st.caption(f"{len(df):,} rows × {len(df.columns)} columns")
+        return
+
+    st.dataframe(df, width='stretch', hide_index=True, column_config=column_config)
+
+
 # ===== PAGE VIEW ANALYTICS =====
 
-@st.cache_data(ttl=300)
-def fetch_page_views_data(date_from="-7d"):
-    """Fetch page view data excluding internal users"""
-    query = {
+INTERNAL_USER_FILTER = "(person.properties.email NOT LIKE '%@datagen.dev' OR person.properties.email IS NULL)"
+
+
+def build_hogql_query(select, event, days=7, where=(), group_by=None, order_by=None, limit=None,
+                      exclude_internal=True):
+    """Build a HogQL query over the last `days` days of `event` with canonical formatting"""
+    conditions = [f"event = '{event}'", f"timestamp >= now() - INTERVAL {days} DAY", *where]
+    if exclude_internal:
+        conditions.append(INTERNAL_USER_FILTER)
+
+    clauses = [
+        "SELECT " + ", ".join(select),
+        "FROM events",
+        "WHERE " + " AND ".join(conditions)
+    ]
+    if group_by:
+        clauses.append(f"GROUP BY {group_by}")
+    if order_by:
+        clauses.append(f"ORDER BY {order_by}")
+    if limit is not None:
+        clauses.append(f"LIMIT {limit}")
+
+    return {
         "kind": "DataVisualizationNode",
         "source": {
             "kind": "HogQLQuery",
-            "query": f"""
-                SELECT
-                    toDate(timestamp) as date,
-                    count() as page_views,
-                    uniq(person_id) as unique_users
-                FROM events
-                WHERE event = 'page_viewed'
-                    AND timestamp >= now() - INTERVAL 7 DAY
-                    AND (person.properties.email NOT LIKE '%@datagen.dev' OR person.properties.email IS NULL)
-                GROUP BY date
-                ORDER BY date
-            """
+            "query": "\n".join(clauses)
         }
     }
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
 
 
-@st.cache_data(ttl=300)
-def fetch_top_pages(date_from="-7d"):
+PAGE_VIEWS_QUERY = build_hogql_query(
+    select=["toDate(timestamp) as date", "count() as page_views", "uniq(person_id) as unique_users"],
+    event="page_viewed",
+    group_by="date",
+    order_by="date"
+)
+
+TOP_PAGES_QUERY = build_hogql_query(
+    select=["properties.$current_url as page", "count() as views"],
+    event="page_viewed",
+    group_by="page",
+    order_by="views DESC",
+    limit=10
+)
+
+REFERRER_QUERY = build_hogql_query(
+    select=["properties.$referring_domain as referrer", "count() as visits"],
+    event="$pageview",
+    where=["properties.$referring_domain IS NOT NULL"],
+    group_by="referrer",
+    order_by="visits DESC",
+    limit=10
+)
+
+
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
+def fetch_page_views_data():
+    """Fetch page view data excluding internal users"""
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": PAGE_VIEWS_QUERY})
+
+
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
+def fetch_top_pages():
     """Fetch top pages by views excluding internal users"""
-    query = {
-        "kind": "DataVisualizationNode",
-        "source": {
-            "kind": "HogQLQuery",
-            "query": f"""
-                SELECT
-                    properties.$current_url as page,
-                    count() as views
-                FROM events
-                WHERE event = 'page_viewed'
-                    AND timestamp >= now() - INTERVAL 7 DAY
-                    AND (person.properties.email NOT LIKE '%@datagen.dev' OR person.properties.email IS NULL)
-                GROUP BY page
-                ORDER BY views DESC
-                LIMIT 10
-            """
-        }
-    }
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": TOP_PAGES_QUERY})
 
 
-@st.cache_data(ttl=300)
-def fetch_referrer_data(date_from="-7d"):
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
+def fetch_referrer_data():
     """Fetch traffic sources excluding internal users"""
-    query = {
-        "kind": "DataVisualizationNode",
-        "source": {
-            "kind": "HogQLQuery",
-            "query": f"""
-                SELECT
-                    properties.$referring_domain as referrer,
-                    count() as visits
-                FROM events
-                WHERE event = '$pageview'
-                    AND timestamp >= now() - INTERVAL 7 DAY
-                    AND properties.$referring_domain IS NOT NULL
-                    AND (person.properties.email NOT LIKE '%@datagen.dev' OR person.properties.email IS NULL)
-                GROUP BY referrer
-                ORDER BY visits DESC
-                LIMIT 10
-            """
-        }
-    }
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": REFERRER_QUERY})
 
 
 def parse_hogql_result(result):
@@ -139,17 +434,9 @@ def parse_hogql_result(result):
     data_rows = []
     for item in result:
         if isinstance(item, str):
-            # Split by newlines and look for data rows
-            lines = item.split('\n')
-            for line in lines:
-                # Look for lines like: "  - [3]: 2025-11-21,271,7"
-                if ' - [' in line and ']: ' in line:
-                    # Extract data after "]: "
-                    parts = line.split(']: ')
-                    if len(parts) == 2:
-                        # Remove quotes and split by comma
-                        values = parts[1].strip().replace('"', '').split(',')
-                        data_rows.append(values)
+            for match in HOGQL_ROW_RE.finditer(item):
+                # Remove quotes and split by comma
+                data_rows.append(match.group(1).strip().replace('"', '').split(','))
 
     if not data_rows:
         return None
@@ -157,6 +444,102 @@ def parse_hogql_result(result):
     return pd.DataFrame(data_rows)
 
 
+def compact_dtypes(df, numeric=(), categorical=()):
+    """Downcast numeric columns to the smallest integer type and store repeated labels as categoricals"""
+    numeric = list(numeric)
+    if numeric:
+        df[numeric] = df[numeric].apply(pd.to_numeric, downcast="integer")
+    for col in categorical:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def get_hogql_df(result, columns, numeric=(), categorical=()):
+    """Parse a HogQL result into a frame with the given column names, or None if it does not fit"""
+    df = parse_hogql_result(result)
+    if df is None or len(df.columns) < len(columns):
+        return None
+    df = df.iloc[:, :len(columns)]
+    df.columns = columns
+    return compact_dtypes(df, numeric=numeric, categorical=categorical)
+
+
+# Parsed frames are cached too, so reruns skip the text parsing as well as the request
+@cache_fetched_data(ttl=300)
+def get_page_views_df():
+    """Daily page views and unique users"""
+    return get_hogql_df(fetch_page_views_data(), ['date', 'page_views', 'unique_users'],
+                        numeric=['page_views', 'unique_users'])
+
+
+@cache_fetched_data(ttl=300)
+def get_top_pages_df():
+    """Views per page"""
+    return get_hogql_df(fetch_top_pages(), ['page', 'views'], numeric=['views'], categorical=['page'])
+
+
+@cache_fetched_data(ttl=300)
+def get_referrer_df():
+    """Visits per referring domain"""
+    return get_hogql_df(fetch_referrer_data(), ['referrer', 'visits'], numeric=['visits'], categorical=['referrer'])
+
+
+@st.cache_data(max_entries=16)
+def build_page_views_figure(df):
+    """Build the page views / unique users trend chart"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df['date'],
+        y=df['page_views'],
+        name='Page Views',
+        mode='lines+markers',
+        line=dict(color='#0045AC', width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=df['date'],
+        y=df['unique_users'],
+        name='Unique Users',
+        mode='lines+markers',
+        line=dict(color='#FF4500', width=2)
+    ))
+    fig.update_layout(
+        xaxis_title='Date',
+        yaxis_title='Count'
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_top_pages_figure(pages_df):
+    """Build the views per page chart"""
+    fig = px.bar(
+        pages_df,
+        x='views',
+        y='page',
+        orientation='h',
+        color='views',
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(
+        showlegend=False,
+        hovermode='closest',
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_referrer_figure(ref_df):
+    """Build the traffic sources chart"""
+    return px.pie(
+        ref_df,
+        values='visits',
+        names='referrer',
+        hole=0.4
+    )
+
+
+@st.fragment
 def render_page_view_analytics():
     """Render page view analytics tab"""
     st.header("📄 Page View Analytics")
@@ -164,108 +547,49 @@ def render_page_view_analytics():
 
     # Fetch data
     with st.spinner("Loading page view data..."):
-        page_views_data = fetch_page_views_data()
-        top_pages_data = fetch_top_pages()
-        referrer_data = fetch_referrer_data()
-
-    # Parse page views trend
-    if page_views_data:
-        df = parse_hogql_result(page_views_data)
-        if df is not None and len(df.columns) >= 3:
-            df.columns = ['date', 'page_views', 'unique_users']
-            df['page_views'] = pd.to_numeric(df['page_views'])
-            df['unique_users'] = pd.to_numeric(df['unique_users'])
-
-            # Metrics
-            col1, col2, col3, col4 = st.columns(4)
-
-            total_views = df['page_views'].sum()
-            total_users = df['unique_users'].sum()
-            avg_views_per_day = df['page_views'].mean()
-            avg_views_per_user = total_views / total_users if total_users > 0 else 0
+        df, pages_df, ref_df = fetch_concurrently(get_page_views_df, get_top_pages_df, get_referrer_df)
 
-            with col1:
-                st.metric("Total Page Views", f"{int(total_views):,}")
-            with col2:
-                st.metric("Unique Users", f"{int(total_users):,}")
-            with col3:
-                st.metric("Avg Views/Day", f"{avg_views_per_day:.1f}")
-            with col4:
-                st.metric("Avg Views/User", f"{avg_views_per_user:.1f}")
-
-            # Page views trend
-            st.subheader("📈 Page Views Trend (Last 7 Days)")
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df['date'],
-                y=df['page_views'],
-                name='Page Views',
-                mode='lines+markers',
-                line=dict(color='#0045AC', width=2)
-            ))
-            fig.add_trace(go.Scatter(
-                x=df['date'],
-                y=df['unique_users'],
-                name='Unique Users',
-                mode='lines+markers',
-                line=dict(color='#FF4500', width=2)
-            ))
-            fig.update_layout(
-                xaxis_title='Date',
-                yaxis_title='Count',
-                hovermode='x unified',
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+    # Page views trend
+    if df is not None:
+        # Metrics
+        col1, col2, col3, col4 = st.columns(4)
+
+        total_views = df['page_views'].sum()
+        total_users = df['unique_users'].sum()
+        avg_views_per_day = df['page_views'].mean()
+        avg_views_per_user = total_views / total_users if total_users > 0 else 0
+
+        with col1:
+            st.metric("Total Page Views", f"{int(total_views):,}")
+        with col2:
+            st.metric("Unique Users", f"{int(total_users):,}")
+        with col3:
+            st.metric("Avg Views/Day", f"{avg_views_per_day:.1f}")
+        with col4:
+            st.metric("Avg Views/User", f"{avg_views_per_user:.1f}")
+
+        # Page views trend
+        st.subheader("📈 Page Views Trend (Last 7 Days)")
+        plot_line_chart(build_page_views_figure(df))
 
     # Top pages and referrers
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("🔝 Top Pages")
-        if top_pages_data:
-            pages_df = parse_hogql_result(top_pages_data)
-            if pages_df is not None and len(pages_df.columns) >= 2:
-                pages_df.columns = ['page', 'views']
-                pages_df['views'] = pd.to_numeric(pages_df['views'])
-
-                fig = px.bar(
-                    pages_df,
-                    x='views',
-                    y='page',
-                    orientation='h',
-                    color='views',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_layout(
-                    showlegend=False,
-                    height=400,
-                    yaxis={'categoryorder': 'total ascending'}
-                )
-                st.plotly_chart(fig, width='stretch')
-
-                with st.expander("View Data"):
-                    st.dataframe(pages_df, width='stretch')
+        if pages_df is not None:
+            st.plotly_chart(build_top_pages_figure(pages_df), width='stretch')
+
+            with st.expander("View Data"):
+                show_table(pages_df, {'views': COUNT_COLUMN})
 
     with col2:
         st.subheader("🌐 Traffic Sources")
-        if referrer_data:
-            ref_df = parse_hogql_result(referrer_data)
-            if ref_df is not None and len(ref_df.columns) >= 2:
-                ref_df.columns = ['referrer', 'visits']
-                ref_df['visits'] = pd.to_numeric(ref_df['visits'])
-
-                fig = px.pie(
-                    ref_df,
-                    values='visits',
-                    names='referrer',
-                    hole=0.4
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, width='stretch')
+        if ref_df is not None:
+            st.plotly_chart(build_referrer_figure(ref_df), width='stretch')
 
-                with st.expander("View Data"):
-                    st.dataframe(ref_df, width='stretch')
+            with st.expander("View Data"):
+                show_table(ref_df, {'visits': COUNT_COLUMN})
 
 
 # ===== DAU ANALYTICS =====
@@ -302,37 +626,41 @@ def build_posthog_query(event="$pageview", math="dau", interval="day",
     return query
 
 
-@st.cache_data(ttl=300)
+DAU_TREND_QUERY = build_posthog_query(date_from="-30d", interval="day")
+
+GEOGRAPHY_QUERY = build_posthog_query(
+    date_from="-7d",
+    breakdown="$geoip_country_name",
+    breakdown_type="event",
+    custom_name="DAU by Country"
+)
+
+HOURLY_PATTERN_QUERY = build_posthog_query(
+    date_from="-7d",
+    interval="hour",
+    custom_name="DAU by Hour"
+)
+
+
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_dau_trend():
     """Fetch DAU trend data"""
-    query = build_posthog_query(date_from="-30d", interval="day")
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": DAU_TREND_QUERY})
 
 
-@st.cache_data(ttl=300)
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_geography():
     """Fetch DAU by geography"""
-    query = build_posthog_query(
-        date_from="-7d",
-        breakdown="$geoip_country_name",
-        breakdown_type="event",
-        custom_name="DAU by Country"
-    )
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": GEOGRAPHY_QUERY})
 
 
-@st.cache_data(ttl=300)
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_hourly_pattern():
     """Fetch hourly DAU pattern"""
-    query = build_posthog_query(
-        date_from="-7d",
-        interval="hour",
-        custom_name="DAU by Hour"
-    )
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": HOURLY_PATTERN_QUERY})
 
 
 def parse_dau_trend(result):
@@ -340,21 +668,16 @@ def parse_dau_trend(result):
     if not result or not isinstance(result, list) or len(result) == 0:
         return None
 
-    data = result[0]
-
-    dau_values = data.split("data[")[1].split("]:")[1].split("\n")[0].strip().split(",")
-    dau_values = [int(x) for x in dau_values if x.strip().isdigit()]
-
-    labels_str = data.split("labels[")[1].split("]:")[1].split("\n")[0].strip()
-    labels_raw = [x.strip() for x in labels_str.split(",")]
+    series = parse_trend_series(result[0])
+    if series is None:
+        return None
 
-    labels = []
-    for label in labels_raw:
-        try:
-            date_obj = datetime.strptime(label, '%d-%b-%Y')
-            labels.append(date_obj.strftime('%Y-%m-%d'))
-        except:
-            labels.append(label)
+    data, labels_text = series
+    # Days without a numeric count are shown as 0
+    dau_values = np.nan_to_num(parse_counts(data)).astype(np.int64)
+    labels = normalize_date_labels([x.strip() for x in labels_text.split(",")])
+    if len(labels) != len(dau_values):
+        return None
 
     df = pd.DataFrame({
         'date': labels,
@@ -369,31 +692,25 @@ def parse_breakdown(result):
     if not result or not isinstance(result, list):
         return None
 
-    breakdown_data = []
-
+    labels, counts = [], []
     for item in result:
-        if "label:" in item:
-            label = item.split("label:")[1].split("\n")[0].strip()
-        else:
-            continue
+        label = BREAKDOWN_LABEL_RE.search(item)
+        if label:
+            count = BREAKDOWN_COUNT_RE.search(item)
+            labels.append(label.group(1).strip())
+            counts.append(count.group(1).strip() if count else None)
 
-        if "count:" in item:
-            count_str = item.split("count:")[1].split("\n")[0].strip()
-            count = int(count_str) if count_str.isdigit() else 0
-        else:
-            count = 0
+    if not labels:
+        return None
 
-        if label and label != "$$_posthog_breakdown_null_$$" and count > 0:
-            breakdown_data.append({
-                'label': label,
-                'count': count
-            })
+    df = pd.DataFrame({'label': labels, 'count': counts})
+    df['count'] = pd.to_numeric(df['count'], errors="coerce").fillna(0).astype("int64")
+    df = df[(df['label'] != "") & (df['label'] != "$$_posthog_breakdown_null_$$") & (df['count'] > 0)].reset_index(drop=True)
 
-    if not breakdown_data:
+    if df.empty:
         return None
 
-    df = pd.DataFrame(breakdown_data)
-    df = df.sort_values('count', ascending=False)
+    df = compact_dtypes(df.sort_values('count', ascending=False), numeric=['count'], categorical=['label'])
 
     return df
 
@@ -403,38 +720,108 @@ def parse_hourly_pattern(result):
     if not result or not isinstance(result, list) or len(result) == 0:
         return None
 
-    data = result[0]
+    series = parse_trend_series(result[0])
+    if series is None:
+        return None
+
+    data, labels_text = series
+    dau_values = parse_counts(data)
+    labels = [x.strip().strip('"') for x in labels_text.split('","')]
 
-    dau_values = data.split("data[")[1].split("]:")[1].split("\n")[0].strip().split(",")
-    dau_values = [int(x) for x in dau_values if x.strip().lstrip('-').isdigit()]
+    n = min(len(labels), len(dau_values))
+    hours = pd.to_numeric(
+        pd.Series(labels[:n]).str.extract(r'(\d{1,2}):\d{2}', expand=False), errors="coerce"
+    ).to_numpy()
 
-    labels_str = data.split("labels[")[1].split("]:")[1].split("\n")[0].strip()
-    labels = [x.strip().strip('"') for x in labels_str.split('","')]
+    # Average per hour of day in one pass; labels without a valid hour or value are skipped
+    values = dau_values[:n]
+    valid = (hours >= 0) & (hours < 24) & ~np.isnan(values)
+    hours = hours[valid].astype(np.intp)
+    values = values[valid]
+    sums = np.bincount(hours, weights=values, minlength=24)
+    counts = np.bincount(hours, minlength=24)
+    avg = np.divide(sums, counts, out=np.zeros(24), where=counts > 0)
 
-    hourly_totals = defaultdict(list)
+    df = pd.DataFrame({'hour': np.arange(24), 'avg_dau': np.round(avg, 2)})
 
-    for label, value in zip(labels, dau_values):
-        if ":" in label:
-            hour_part = label.split()[-1].split(":")[0]
-            hour = int(hour_part)
-            hourly_totals[hour].append(value)
+    return df
 
-    hourly_avg = []
-    for hour in range(24):
-        if hour in hourly_totals and len(hourly_totals[hour]) > 0:
-            avg = sum(hourly_totals[hour]) / len(hourly_totals[hour])
-        else:
-            avg = 0
-        hourly_avg.append({
-            'hour': hour,
-            'avg_dau': round(avg, 2)
-        })
 
-    df = pd.DataFrame(hourly_avg)
+@cache_fetched_data(ttl=300)
+def get_dau_df():
+    """Daily active users over the last 30 days"""
+    return parse_dau_trend(fetch_dau_trend())
 
-    return df
+
+@cache_fetched_data(ttl=300)
+def get_geography_df():
+    """Active users per country"""
+    return parse_breakdown(fetch_geography())
+
+
+@cache_fetched_data(ttl=300)
+def get_hourly_df():
+    """Average active users per hour of day"""
+    return parse_hourly_pattern(fetch_hourly_pattern())
+
+
+@st.cache_data(max_entries=16)
+def build_dau_trend_figure(dau_df):
+    """Build the DAU trend chart"""
+    fig = px.line(
+        dau_df,
+        x='date',
+        y='dau',
+        title='Daily Active Users Over Time',
+        labels={'date': 'Date', 'dau': 'Daily Active Users'},
+        markers=True
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_geography_figure(geo_df):
+    """Build the DAU by country chart"""
+    fig = px.bar(
+        geo_df,
+        x='label',
+        y='count',
+        title='DAU by Country (Last 7 Days)',
+        labels={'label': 'Country', 'count': 'DAU'},
+        color='count',
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        showlegend=False,
+        hovermode='closest'
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_hourly_figure(hourly_df):
+    """Build the average DAU by hour of day chart"""
+    fig = px.line(
+        hourly_df,
+        x='hour',
+        y='avg_dau',
+        title='Average DAU by Hour of Day (Last 7 Days)',
+        labels={'hour': 'Hour (UTC)', 'avg_dau': 'Average DAU'},
+        markers=True
+    )
+    fig.update_layout(
+        xaxis=dict(
+            tickmode='linear',
+            tick0=0,
+            dtick=2
+        )
+    )
+    return fig
 
 
+@st.fragment
 def render_dau_analytics():
     """Render DAU analytics tab"""
     st.header("👥 Daily Active Users (DAU)")
@@ -442,21 +829,15 @@ def render_dau_analytics():
 
     # Fetch data
     with st.spinner("Loading DAU data..."):
-        dau_trend = fetch_dau_trend()
-        geography = fetch_geography()
-        hourly = fetch_hourly_pattern()
-
-    # Parse data
-    dau_df = parse_dau_trend(dau_trend)
-    geo_df = parse_breakdown(geography)
-    hourly_df = parse_hourly_pattern(hourly)
+        dau_df, geo_df, hourly_df = fetch_concurrently(get_dau_df, get_geography_df, get_hourly_df)
 
     # Metrics
     if dau_df is not None and len(dau_df) > 0:
-        today_dau = dau_df.iloc[-1]['dau']
-        yesterday_dau = dau_df.iloc[-2]['dau'] if len(dau_df) > 1 else 0
-        avg_7d = int(dau_df.iloc[-7:]['dau'].mean()) if len(dau_df) >= 7 else 0
-        avg_30d = int(dau_df['dau'].mean())
+        dau = dau_df['dau'].to_numpy()
+        today_dau = int(dau[-1])
+        yesterday_dau = int(dau[-2]) if len(dau) > 1 else 0
+        avg_7d = int(dau[-7:].mean()) if len(dau) >= 7 else 0
+        avg_30d = int(dau.mean())
 
         today_delta = today_dau - yesterday_dau if yesterday_dau > 0 else 0
         today_delta_pct = f"{((today_delta / yesterday_dau) * 100):.1f}%" if yesterday_dau > 0 else "N/A"
@@ -485,19 +866,7 @@ def render_dau_analytics():
     # DAU Trend Chart
     st.subheader("📈 DAU Trend (Last 30 Days)")
     if dau_df is not None:
-        fig = px.line(
-            dau_df,
-            x='date',
-            y='dau',
-            title='Daily Active Users Over Time',
-            labels={'date': 'Date', 'dau': 'Daily Active Users'},
-            markers=True
-        )
-        fig.update_layout(
-            hovermode='x unified',
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig, width='stretch')
+        plot_line_chart(build_dau_trend_figure(dau_df))
     else:
         st.warning("No DAU trend data available")
 
@@ -507,114 +876,127 @@ def render_dau_analytics():
     with col1:
         st.subheader("🌍 Geographic Distribution")
         if geo_df is not None:
-            fig = px.bar(
-                geo_df,
-                x='label',
-                y='count',
-                title='DAU by Country (Last 7 Days)',
-                labels={'label': 'Country', 'count': 'DAU'},
-                color='count',
-                color_continuous_scale='Blues'
-            )
-            fig.update_layout(
-                xaxis_tickangle=-45,
-                showlegend=False
-            )
-            st.plotly_chart(fig, width='stretch')
+            st.plotly_chart(build_geography_figure(geo_df), width='stretch')
 
             with st.expander("View Data"):
-                st.dataframe(geo_df, width='stretch')
+                show_table(geo_df, {'count': COUNT_COLUMN})
         else:
             st.info("No geographic breakdown data available")
 
     with col2:
         st.subheader("⏰ Hourly Activity Pattern")
         if hourly_df is not None:
-            fig = px.line(
-                hourly_df,
-                x='hour',
-                y='avg_dau',
-                title='Average DAU by Hour of Day (Last 7 Days)',
-                labels={'hour': 'Hour (UTC)', 'avg_dau': 'Average DAU'},
-                markers=True
-            )
-            fig.update_layout(
-                xaxis=dict(
-                    tickmode='linear',
-                    tick0=0,
-                    dtick=2
-                )
-            )
-            st.plotly_chart(fig, width='stretch')
+            plot_line_chart(build_hourly_figure(hourly_df))
 
             with st.expander("View Data"):
-                st.dataframe(hourly_df, width='stretch')
+                show_table(hourly_df, {'avg_dau': AVERAGE_COLUMN})
         else:
             st.info("No hourly pattern data available")
 
 
 # ===== ERROR TRACKER =====
 
-@st.cache_data(ttl=300)
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_errors():
     """Fetch error list from PostHog"""
     result = call_datagen_tool("mcp_Posthog_list_errors", {})
     return result
 
 
-@st.cache_data(ttl=300)
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_error_details(error_id):
     """Fetch error details from PostHog"""
     result = call_datagen_tool("mcp_Posthog_error_details", {"error_id": error_id})
     return result
 
 
-@st.cache_data(ttl=300)
+@st.cache_resource(max_entries=8)
+def build_error_timeline_query(days):
+    """Build the daily error count query for the last `days` days"""
+    return build_hogql_query(
+        select=["toDate(timestamp) as date", "count() as error_count", "uniq(person_id) as affected_users"],
+        event="$exception",
+        days=days,
+        group_by="date",
+        order_by="date",
+        exclude_internal=False
+    )
+
+
+# First exception type of an $exception event, e.g. TypeError
+ERROR_TYPE_EXPR = "replaceAll(arrayElement(JSONExtractArrayRaw(properties, '$exception_types'), 1), '\"', '')"
+
+# Error types beyond this many (by occurrences) are left out of the per-type trend
+MAX_ERROR_TYPES = 20
+
+
+def hogql_string(value):
+    """Quote a value as a HogQL string literal"""
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+@st.cache_resource(max_entries=8)
+def build_error_types_query(days):
+    """Build the query listing the most frequent error types in the last `days` days"""
+    return build_hogql_query(
+        select=[f"{ERROR_TYPE_EXPR} as error_type", "count() as count"],
+        event="$exception",
+        days=days,
+        group_by="error_type",
+        order_by="count DESC",
+        limit=MAX_ERROR_TYPES,
+        exclude_internal=False
+    )
+
+
+@st.cache_resource(max_entries=8)
+def build_error_timeline_by_type_query(days, error_types):
+    """Build the daily error count query with one column per error type"""
+    counts = [
+        f"countIf({ERROR_TYPE_EXPR} = {hogql_string(error_type)}) as type_{i}"
+        for i, error_type in enumerate(error_types)
+    ]
+    return build_hogql_query(
+        select=["toDate(timestamp) as date", *counts],
+        event="$exception",
+        days=days,
+        group_by="date",
+        order_by="date",
+        exclude_internal=False
+    )
+
+
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_error_timeline(days=30):
     """Fetch error occurrences over time"""
-    query = {
-        "kind": "DataVisualizationNode",
-        "source": {
-            "kind": "HogQLQuery",
-            "query": f"""
-                SELECT
-                    toDate(timestamp) as date,
-                    count() as error_count,
-                    uniq(person_id) as affected_users
-                FROM events
-                WHERE event = '$exception'
-                    AND timestamp >= now() - INTERVAL {days} DAY
-                GROUP BY date
-                ORDER BY date
-            """
-        }
-    }
-    result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": build_error_timeline_query(days)})
 
 
-@st.cache_data(ttl=300)
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
+def fetch_error_types(days=30):
+    """Fetch the most frequent error types"""
+    return call_datagen_tool("mcp_Posthog_query_run", {"query": build_error_types_query(days)})
+
+
+@cache_fetched_data(ttl=300)
+@disk_cached(ttl=300, on_stale=report_stale)
 def fetch_error_timeline_by_type(days=30):
-    """Fetch error occurrences by error type over time"""
-    query = {
-        "kind": "DataVisualizationNode",
-        "source": {
-            "kind": "HogQLQuery",
-            "query": f"""
-                SELECT
-                    toDate(timestamp) as date,
-                    replaceAll(arrayElement(JSONExtractArrayRaw(properties, '$exception_types'), 1), '"', '') as error_type,
-                    count() as count
-                FROM events
-                WHERE event = '$exception'
-                    AND timestamp >= now() - INTERVAL {days} DAY
-                GROUP BY date, error_type
-                ORDER BY date, count DESC
-            """
-        }
-    }
+    """Fetch daily error occurrences pivoted to one column per error type"""
+    types_df = parse_hogql_result(fetch_error_types(days=days))
+    if types_df is None:
+        return None
+
+    error_types = tuple(types_df[0])
+    query = build_error_timeline_by_type_query(days, error_types)
     result = call_datagen_tool("mcp_Posthog_query_run", {"query": query})
-    return result
+    if not result:
+        return None
+
+    return {"error_types": list(error_types), "result": result}
 
 
 def parse_errors(result):
@@ -622,89 +1004,187 @@ def parse_errors(result):
     if not result or not isinstance(result, list):
         return None
 
-    errors = []
+    records = []
     for item in result:
         if isinstance(item, str):
-            # Parse error data from string format
-            error_data = {}
-
-            # Extract key fields
-            if "id:" in item:
-                error_data['id'] = item.split("id:")[1].split("\n")[0].strip()
-            if "name:" in item:
-                error_data['name'] = item.split("name:")[1].split("\n")[0].strip()
-            if "description:" in item:
-                error_data['description'] = item.split("description:")[1].split("\n")[0].strip()
-            if "source:" in item:
-                error_data['source'] = item.split("source:")[1].split("\n")[0].strip()
-            if "status:" in item:
-                error_data['status'] = item.split("status:")[1].split("\n")[0].strip()
-
-            # Parse aggregations
-            if "occurrences:" in item:
-                occ_str = item.split("occurrences:")[1].split("\n")[0].strip()
-                error_data['occurrences'] = int(occ_str) if occ_str.isdigit() else 0
-
-            if "users:" in item:
-                users_str = item.split("users:")[1].split("\n")[0].strip()
-                error_data['users'] = int(users_str) if users_str.isdigit() else 0
-
-            if "sessions:" in item:
-                sessions_str = item.split("sessions:")[1].split("\n")[0].strip()
-                error_data['sessions'] = int(sessions_str) if sessions_str.isdigit() else 0
-
-            if "first_seen:" in item:
-                error_data['first_seen'] = item.split("first_seen:")[1].split("\n")[0].strip().replace('"', '')
-
-            if "last_seen:" in item:
-                error_data['last_seen'] = item.split("last_seen:")[1].split("\n")[0].strip().replace('"', '')
-
+            fields = parse_fields(item)
+            error_data = {key: fields[key] for key in ERROR_FIELDS if key in fields}
             if error_data:
-                errors.append(error_data)
+                records.append(error_data)
 
-    if not errors:
+    if not records:
         return None
 
-    return pd.DataFrame(errors)
+    # Every field becomes a column, so the tracker never has to check for missing ones
+    df = pd.DataFrame.from_records(records, columns=ERROR_FIELDS)
 
+    # Aggregations come back as text; coerce in one vector pass per column
+    for col in ('occurrences', 'users', 'sessions'):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
 
-def render_error_tracker():
-    """Render error tracker tab"""
-    st.header("🐛 Error Tracker")
-    st.markdown("*Monitor and track application errors*")
+    df = df.fillna(ERROR_DEFAULTS)
+    df['status'] = df['status'].astype("category")
 
-    # Fetch errors
-    with st.spinner("Loading errors..."):
-        errors_data = fetch_errors()
+    for col in ('first_seen', 'last_seen'):
+        df[col] = df[col].str.replace('"', '', regex=False)
 
-    if not errors_data:
-        st.info("No errors found")
-        return
+    df.insert(0, 'status_icon', np.where(df['status'].eq('active'), "🔴", "🟢"))
 
-    errors_df = parse_errors(errors_data)
+    return df
 
-    if errors_df is None or len(errors_df) == 0:
-        st.success("✅ No errors found!")
-        return
 
-    # Summary metrics
-    col1, col2, col3, col4 = st.columns(4)
+# An empty frame means the query ran but returned no rows; None means it failed
+@cache_fetched_data(ttl=300)
+def get_errors_df():
+    """Tracked errors with their aggregations"""
+    result = fetch_errors()
+    if not result:
+        return None
+    df = parse_errors(result)
+    return df if df is not None else pd.DataFrame(columns=['status_icon', *ERROR_FIELDS])
 
-    total_errors = len(errors_df)
-    total_occurrences = errors_df['occurrences'].sum() if 'occurrences' in errors_df.columns else 0
-    total_users = errors_df['users'].sum() if 'users' in errors_df.columns else 0
-    active_errors = len(errors_df[errors_df['status'] == 'active']) if 'status' in errors_df.columns else 0
 
-    with col1:
-        st.metric("Total Errors", total_errors)
-    with col2:
-        st.metric("Total Occurrences", int(total_occurrences))
-    with col3:
-        st.metric("Affected Users", int(total_users))
-    with col4:
-        st.metric("Active Errors", active_errors)
+@cache_fetched_data(ttl=300)
+def get_error_timeline_df(days=30):
+    """Daily error occurrences and affected users"""
+    result = fetch_error_timeline(days=days)
+    if not result:
+        return None
+    columns = ['date', 'error_count', 'affected_users']
+    df = get_hogql_df(result, columns, numeric=columns[1:])
+    return df if df is not None else pd.DataFrame(columns=columns)
+
+
+@cache_fetched_data(ttl=300)
+def get_error_type_trend_df(days=30):
+    """Daily occurrences with one type_i column per error type, and the error type names in column order"""
+    by_type = fetch_error_timeline_by_type(days=days)
+    if not by_type:
+        return None
+
+    # Already pivoted server-side: one row per date, one column per error type. Columns keep
+    # the query's type_i aliases, since type names need not be unique or differ from "date"
+    error_types = tuple(by_type['error_types'])
+    df = parse_hogql_result(by_type['result'])
+    if df is None or len(df.columns) != len(error_types) + 1:
+        return None
+    type_columns = [f"type_{i}" for i in range(len(error_types))]
+    df.columns = ['date', *type_columns]
+    return compact_dtypes(df, numeric=type_columns), error_types
+
+
+@st.cache_data(max_entries=16)
+def build_error_timeline_figure(timeline_df, days):
+    """Build the error occurrences / affected users chart"""
+    fig = go.Figure()
+
+    # Add error count line
+    fig.add_trace(go.Scatter(
+        x=timeline_df['date'],
+        y=timeline_df['error_count'],
+        name='Error Occurrences',
+        mode='lines+markers',
+        line=dict(color='#DC2626', width=2),
+        marker=dict(size=8),
+        yaxis='y'
+    ))
+
+    # Add affected users line
+    fig.add_trace(go.Scatter(
+        x=timeline_df['date'],
+        y=timeline_df['affected_users'],
+        name='Affected Users',
+        mode='lines+markers',
+        line=dict(color='#F59E0B', width=2),
+        marker=dict(size=8),
+        yaxis='y2'
+    ))
+
+    fig.update_layout(
+        title=f'Error Timeline - Last {days} Days',
+        xaxis=dict(title='Date'),
+        yaxis=dict(
+            title='Error Occurrences',
+            tickfont=dict(color='#DC2626'),
+            title_font=dict(color='#DC2626')
+        ),
+        yaxis2=dict(
+            title='Affected Users',
+            tickfont=dict(color='#F59E0B'),
+            title_font=dict(color='#F59E0B'),
+            overlaying='y',
+            side='right'
+        ),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_error_type_trend_figure(type_df, error_types, days):
+    """Build the daily error count by type chart from the wide (one type_i column per type) frame"""
+    fig = go.Figure([
+        go.Scatter(
+            x=type_df['date'],
+            y=type_df[f"type_{i}"],
+            name=error_type,
+            mode='lines+markers',
+            line=dict(width=2),
+            marker=dict(size=6)
+        )
+        for i, error_type in enumerate(error_types)
+    ])
+    fig.update_layout(
+        title=f'Daily Error Trend by Type - Last {days} Days',
+        xaxis_title='Date',
+        yaxis_title='Error Count',
+        legend_title_text='Error Type',
+        showlegend=True,
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=1,
+            xanchor="left",
+            x=1.02
+        )
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16)
+def build_top_errors_figure(errors_df):
+    """Build the top 10 errors by occurrence chart"""
+    top_errors = errors_df.nlargest(10, 'occurrences')[['name', 'occurrences', 'users']]
+
+    fig = px.bar(
+        top_errors,
+        x='occurrences',
+        y='name',
+        orientation='h',
+        title='Top Errors by Occurrence',
+        color='occurrences',
+        color_continuous_scale='Reds',
+        labels={'name': 'Error', 'occurrences': 'Occurrences'}
+    )
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        showlegend=False,
+        hovermode='closest'
+    )
+    return fig
+
 
-    # Error Timeline
+@st.fragment
+def render_error_timeline():
+    """Render the error timeline section; changing the time range reruns only this fragment"""
     st.subheader("📅 Error Timeline")
 
     # Time range selector
@@ -714,184 +1194,222 @@ def render_error_tracker():
             "Time Range",
             options=[7, 14, 30, 60, 90],
             index=2,  # Default to 30 days
-            format_func=lambda x: f"Last {x} days"
+            format_func=lambda x: f"Last {x} days",
+            key="timeline_days"
         )
 
     with st.spinner("Loading error timeline..."):
-        timeline_data = fetch_error_timeline(days=timeline_days)
-        timeline_by_type_data = fetch_error_timeline_by_type(days=timeline_days)
-
-    # Parse and display timeline
-    if timeline_data:
-        timeline_df = parse_hogql_result(timeline_data)
-        if timeline_df is not None and len(timeline_df.columns) >= 3:
-            timeline_df.columns = ['date', 'error_count', 'affected_users']
-            timeline_df['error_count'] = pd.to_numeric(timeline_df['error_count'])
-            timeline_df['affected_users'] = pd.to_numeric(timeline_df['affected_users'])
-
-            # Create timeline chart
-            fig = go.Figure()
-
-            # Add error count line
-            fig.add_trace(go.Scatter(
-                x=timeline_df['date'],
-                y=timeline_df['error_count'],
-                name='Error Occurrences',
-                mode='lines+markers',
-                line=dict(color='#DC2626', width=2),
-                marker=dict(size=8),
-                yaxis='y'
-            ))
-
-            # Add affected users line
-            fig.add_trace(go.Scatter(
-                x=timeline_df['date'],
-                y=timeline_df['affected_users'],
-                name='Affected Users',
-                mode='lines+markers',
-                line=dict(color='#F59E0B', width=2),
-                marker=dict(size=8),
-                yaxis='y2'
-            ))
-
-            fig.update_layout(
-                title=f'Error Timeline - Last {timeline_days} Days',
-                xaxis=dict(title='Date'),
-                yaxis=dict(
-                    title='Error Occurrences',
-                    tickfont=dict(color='#DC2626'),
-                    title_font=dict(color='#DC2626')
-                ),
-                yaxis2=dict(
-                    title='Affected Users',
-                    tickfont=dict(color='#F59E0B'),
-                    title_font=dict(color='#F59E0B'),
-                    overlaying='y',
-                    side='right'
-                ),
-                hovermode='x unified',
-                height=400,
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                )
-            )
-
-            st.plotly_chart(fig, width='stretch')
+        timeline_df, type_trend = fetch_concurrently(
+            partial(get_error_timeline_df, days=timeline_days),
+            partial(get_error_type_trend_df, days=timeline_days)
+        )
 
-            # Show timeline data table
-            with st.expander("View Timeline Data"):
-                st.dataframe(timeline_df, width='stretch')
-        else:
-            st.info(f"No errors recorded in the last {timeline_days} days")
-    else:
+    # Display timeline
+    if timeline_df is None:
         st.info(f"No error timeline data available for the last {timeline_days} days")
+    elif timeline_df.empty:
+        st.info(f"No errors recorded in the last {timeline_days} days")
+    else:
+        plot_line_chart(build_error_timeline_figure(timeline_df, timeline_days))
+
+        # Show timeline data table
+        with st.expander("View Timeline Data"):
+            show_table(
+                timeline_df, {'error_count': COUNT_COLUMN, 'affected_users': COUNT_COLUMN},
+                key="timeline-table"
+            )
 
     # Daily error trend by type
-    if timeline_by_type_data:
+    if type_trend is not None:
+        type_df, error_types = type_trend
         st.subheader("📈 Daily Error Trend by Type")
 
-        type_df = parse_hogql_result(timeline_by_type_data)
-        if type_df is not None and len(type_df.columns) >= 3:
-            type_df.columns = ['date', 'error_type', 'count']
-            type_df['count'] = pd.to_numeric(type_df['count'])
+        plot_line_chart(build_error_type_trend_figure(type_df, error_types, timeline_days))
 
-            # Create line trend chart
-            fig = px.line(
+        with st.expander("View Error Trend Data"):
+            show_table(
                 type_df,
-                x='date',
-                y='count',
-                color='error_type',
-                title=f'Daily Error Trend by Type - Last {timeline_days} Days',
-                labels={'count': 'Error Count', 'date': 'Date', 'error_type': 'Error Type'},
-                markers=True
+                {
+                    f"type_{i}": st.column_config.NumberColumn(error_type, format="%d")
+                    for i, error_type in enumerate(error_types)
+                },
+                key="error-trend-table"
             )
-            fig.update_layout(
-                hovermode='x unified',
-                height=400,
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="top",
-                    y=1,
-                    xanchor="left",
-                    x=1.02
-                )
-            )
-            fig.update_traces(line=dict(width=2), marker=dict(size=6))
-            st.plotly_chart(fig, width='stretch')
 
-            with st.expander("View Error Trend Data"):
-                # Pivot table for better viewing
-                pivot_df = type_df.pivot(index='date', columns='error_type', values='count').fillna(0)
-                pivot_df = pivot_df.astype(int)
-                st.dataframe(pivot_df, width='stretch')
+
+@st.fragment
+def render_error_tracker():
+    """Render error tracker tab"""
+    st.header("🐛 Error Tracker")
+    st.markdown("*Monitor and track application errors*")
+
+    # The time range widget lives in the timeline fragment below; warm its queries
+    # for the current selection in the same batch as the error list
+    timeline_days = st.session_state.get("timeline_days", 30)
+
+    # Fetch errors
+    with st.spinner("Loading errors..."):
+        errors_df, _, _ = fetch_concurrently(
+            get_errors_df,
+            partial(get_error_timeline_df, days=timeline_days),
+            partial(get_error_type_trend_df, days=timeline_days)
+        )
+
+    if errors_df is None:
+        st.info("No errors found")
+        return
+
+    if errors_df.empty:
+        st.success("✅ No errors found!")
+        return
+
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+
+    total_errors = len(errors_df)
+    total_occurrences = errors_df['occurrences'].sum()
+    total_users = errors_df['users'].sum()
+    active_errors = int(errors_df['status'].eq('active').sum())
+
+    with col1:
+        st.metric("Total Errors", total_errors)
+    with col2:
+        st.metric("Total Occurrences", int(total_occurrences))
+    with col3:
+        st.metric("Affected Users", int(total_users))
+    with col4:
+        st.metric("Active Errors", active_errors)
+
+    render_error_timeline()
 
     # Error list
     st.subheader("📋 Error List")
 
-    # Display errors as expandable cards
-    for idx, error in errors_df.iterrows():
-        status_emoji = "🔴" if error.get('status') == 'active' else "🟢"
+    # Display errors as a single selectable table; details only for the selected row
+    selection = st.dataframe(
+        errors_df[['status_icon', 'status', 'name', 'description', 'occurrences', 'users', 'sessions', 'last_seen']],
+        width='stretch',
+        hide_index=True,
+        column_config={'status_icon': st.column_config.TextColumn("", width="small")},
+        key="errors-grid",
+        on_select="rerun",
+        selection_mode="single-row"
+    )
+
+    selected_rows = selection.selection.rows
+    if selected_rows:
+        error = errors_df.iloc[selected_rows[0]]
 
-        with st.expander(f"{status_emoji} {error.get('name', 'Unknown Error')} - {error.get('description', '')}"):
+        with st.container(border=True):
+            st.markdown(f"#### {error['status_icon']} {error['name']} - {error['description']}")
             col1, col2 = st.columns(2)
 
             with col1:
-                st.markdown(f"**Error ID:** `{error.get('id', 'N/A')}`")
-                st.markdown(f"**Source:** `{error.get('source', 'N/A')}`")
-                st.markdown(f"**Status:** {error.get('status', 'N/A')}")
+                st.markdown(f"**Error ID:** `{error['id']}`")
+                st.markdown(f"**Source:** `{error['source']}`")
+                st.markdown(f"**Status:** {error['status']}")
 
             with col2:
-                st.markdown(f"**Occurrences:** {error.get('occurrences', 0)}")
-                st.markdown(f"**Affected Users:** {error.get('users', 0)}")
-                st.markdown(f"**Sessions:** {error.get('sessions', 0)}")
+                st.markdown(f"**Occurrences:** {error['occurrences']}")
+                st.markdown(f"**Affected Users:** {error['users']}")
+                st.markdown(f"**Sessions:** {error['sessions']}")
 
-            if 'first_seen' in error and error['first_seen']:
+            if error['first_seen']:
                 st.markdown(f"**First Seen:** {error['first_seen']}")
-            if 'last_seen' in error and error['last_seen']:
+            if error['last_seen']:
                 st.markdown(f"**Last Seen:** {error['last_seen']}")
+    else:
+        st.caption("Select an error in the table to see its details")
 
     # Error trends
     st.subheader("📊 Error Statistics")
 
-    if 'occurrences' in errors_df.columns:
-        # Top errors by occurrence
-        top_errors = errors_df.nlargest(10, 'occurrences')[['name', 'occurrences', 'users']]
-
-        fig = px.bar(
-            top_errors,
-            x='occurrences',
-            y='name',
-            orientation='h',
-            title='Top Errors by Occurrence',
-            color='occurrences',
-            color_continuous_scale='Reds',
-            labels={'name': 'Error', 'occurrences': 'Occurrences'}
-        )
-        fig.update_layout(
-            yaxis={'categoryorder': 'total ascending'},
-            showlegend=False,
-            height=400
-        )
-        st.plotly_chart(fig, width='stretch')
+    if errors_df['occurrences'].any():
+        st.plotly_chart(build_top_errors_figure(errors_df), width='stretch')
 
 
 # ===== MAIN APP =====
 
+# Section label -> renderer, in navigation order
+SECTIONS = {
+    "📄 Page Views": render_page_view_analytics,
+    "👥 DAU Analytics": render_dau_analytics,
+    "🐛 Error Tracker": render_error_tracker,
+}
+
+
+# Section label -> cached loaders and fetchers cleared together when that section is refreshed
+INVALIDATION_GROUPS = {
+    "📄 Page Views": [
+        get_page_views_df, get_top_pages_df, get_referrer_df,
+        fetch_page_views_data, fetch_top_pages, fetch_referrer_data
+    ],
+    "👥 DAU Analytics": [
+        get_dau_df, get_geography_df, get_hourly_df,
+        fetch_dau_trend, fetch_geography, fetch_hourly_pattern
+    ],
+    "🐛 Error Tracker": [
+        get_errors_df, get_error_timeline_df, get_error_type_trend_df,
+        fetch_errors, fetch_error_details, fetch_error_timeline,
+        fetch_error_types, fetch_error_timeline_by_type
+    ],
+}
+
+
+def refresh_sections(sections, clear_disk=False):
+    """Drop the cached responses of the chosen sections and re-query them in one concurrent fan-out
+
+    The MCP tools have no batch endpoint, so this is the closest equivalent: all
+    queries are in flight together and land in the cache before the rerun, and
+    switching to a refreshed section afterwards needs no further round-trips.
+    Sections that were not chosen keep their warm cache.
+
+    The chosen sections' disk entries are expired rather than reused, so PostHog is
+    always re-queried; they stay as the stale fallback unless clear_disk deletes them.
+    """
+    for section in sections:
+        for cached in INVALIDATION_GROUPS[section]:
+            cached.clear()
+            # Fetchers have a disk_cached wrapper under their st.cache_data one
+            drop_disk_cache = getattr(
+                cached.__wrapped__, "clear_disk_cache" if clear_disk else "expire_disk_cache", None
+            )
+            if drop_disk_cache:
+                drop_disk_cache()
+
+    timeline_days = st.session_state.get("timeline_days", 30)
+    prefetchers = {
+        "📄 Page Views": [get_page_views_df, get_top_pages_df, get_referrer_df],
+        "👥 DAU Analytics": [get_dau_df, get_geography_df, get_hourly_df],
+        "🐛 Error Tracker": [
+            get_errors_df,
+            partial(get_error_timeline_df, days=timeline_days),
+            partial(get_error_type_trend_df, days=timeline_days)
+        ],
+    }
+
+    with st.spinner("Refreshing..."):
+        fetch_concurrently(*(fetcher for section in sections for fetcher in prefetchers[section]))
+
+
 def main():
     st.title("📊 PostHog Analytics Dashboard")
 
-    # Refresh button
+    # Refresh menu: pick the sections to re-query, optionally deleting their disk cache entries
     col1, col2 = st.columns([6, 1])
     with col2:
-        if st.button("🔄 Refresh", width='stretch'):
-            st.cache_data.clear()
-            st.rerun()
+        with st.popover("🔄 Refresh", width='stretch'):
+            chosen = [
+                section for section in INVALIDATION_GROUPS
+                if st.checkbox(section, value=True, key=f"refresh-{section}")
+            ]
+            hard = st.checkbox(
+                "🧹 Also clear disk cache", key="refresh-disk",
+                help="Also delete the stored responses that are shown when PostHog cannot be reached"
+            )
+            if st.button("Refresh", type="primary", width='stretch', disabled=not chosen):
+                refresh_sections(chosen, clear_disk=hard)
+                st.rerun()
 
     # Check API key
     if not DATAGEN_API_KEY:
@@ -899,21 +1417,17 @@ def main():
         st.code("DATAGEN_API_KEY=your-api-key-here", language="bash")
         return
 
-    # Tab-based navigation with lazy loading
-    tabs = st.tabs(["📄 Page Views", "👥 DAU Analytics", "🐛 Error Tracker"])
-
-    with tabs[0]:
-        render_page_view_analytics()
-
-    with tabs[1]:
-        render_dau_analytics()
-
-    with tabs[2]:
-        render_error_tracker()
+    # Tab-based navigation with lazy loading: only the selected section renders and fetches
+    active_tab = st.radio("Section", list(SECTIONS), key="active_tab", horizontal=True, label_visibility="collapsed")
+    SECTIONS[active_tab]()
 
     # Footer
     st.markdown("---")
-    st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    disk_cache = get_disk_cache()
+    st.caption(
+        f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} · "
+        f"Disk cache: {disk_cache.hits} hits / {disk_cache.misses} misses ({disk_cache.hit_rate():.0%} hit rate)"
+    )
 
 
 if __name__ == "__main__":
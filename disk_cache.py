@@ -0,0 +1,162 @@
+"""
+Persistent response cache
+SQLite-backed key/value store that survives process restarts and new sessions
+"""
+
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import wraps
+
+# Cache file location (override with POSTHOG_DASHBOARD_CACHE)
+CACHE_PATH = os.getenv("POSTHOG_DASHBOARD_CACHE", ".cache/posthog-dashboard.sqlite")
+
+# Bumped whenever the table layout, key format or body encoding changes; older caches are dropped
+SCHEMA_VERSION = 2
+
+
+class DiskCache:
+    """zlib-compressed JSON values stored in SQLite with a per-read TTL"""
+
+    def __init__(self, path=CACHE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Shared across the dashboard's worker threads, so serialize access
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS kv")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, ts REAL NOT NULL, body BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        # Key prefix -> time before which its entries count as expired (see expire)
+        self._expired_before = {}
+
+    def _read(self, key):
+        with self._lock:
+            return self._conn.execute("SELECT ts, body FROM kv WHERE key = ?", (key,)).fetchone()
+
+    def get(self, key, ttl):
+        """Return the cached value for key if younger than ttl seconds, else None"""
+        # The counters and expiry marks are shared by the dashboard's fetch workers
+        with self._lock:
+            row = self._conn.execute("SELECT ts, body FROM kv WHERE key = ?", (key,)).fetchone()
+            expired_before = max(
+                (ts for prefix, ts in self._expired_before.items() if key.startswith(prefix)), default=0.0
+            )
+            fresh = row is not None and time.time() - row[0] <= ttl and row[0] > expired_before
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if not fresh:
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def get_stale(self, key):
+        """Return (stored_at, value) for key regardless of age, or None if it was never stored"""
+        row = self._read(key)
+        if row is None:
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key"""
+        body = zlib.compress(json.dumps(value).encode())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, ts, body) VALUES (?, ?, ?)",
+                (key, time.time(), body)
+            )
+            self._conn.commit()
+
+    def expire(self, prefix):
+        """Make get miss on entries under prefix stored until now, keeping them for get_stale"""
+        with self._lock:
+            self._expired_before[prefix] = time.time()
+
+    def clear(self, prefix=None):
+        """Remove every cached entry, or only those whose key starts with prefix"""
+        with self._lock:
+            if prefix is None:
+                self._conn.execute("DELETE FROM kv")
+            else:
+                self._conn.execute("DELETE FROM kv WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            self._conn.commit()
+
+    def hit_rate(self):
+        """Fraction of reads served from the cache since startup"""
+        with self._lock:
+            hits, total = self.hits, self.hits + self.misses
+        return hits / total if total else 0.0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide DiskCache, creating it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache()
+        return _cache
+
+
+def disk_cached(ttl, on_stale=None):
+    """Cache a function's JSON-serializable result on disk for ttl seconds
+
+    None results are not stored, so failed calls are retried on the next read.
+    When a call fails and an expired entry exists, on_stale(stored_at) is called
+    and the expired value is returned instead of None. The value itself looks like
+    a fresh one, so on_stale is where callers flag it (e.g. to keep it out of
+    in-memory caches).
+    The wrapper's clear_disk_cache() drops this function's entries only, and
+    expire_disk_cache() forces the next call to re-run while keeping the entries
+    as the stale fallback.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        # Every key for this function starts with its JSON-encoded name
+        prefix = json.dumps([func.__qualname__])[:-1] + ","
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Key on the bound arguments, so f(30), f(days=30) and f() share an entry
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps([func.__qualname__, bound.arguments], sort_keys=True, default=str)
+            cache = get_cache()
+
+            value = cache.get(key, ttl)
+            if value is not None:
+                return value
+
+            value = func(*args, **kwargs)
+            if value is not None:
+                cache.set(key, value)
+            elif on_stale is not None:
+                stale = cache.get_stale(key)
+                if stale is not None:
+                    stored_at, value = stale
+                    on_stale(stored_at)
+            return value
+
+        wrapper.clear_disk_cache = lambda: get_cache().clear(prefix)
+        wrapper.expire_disk_cache = lambda: get_cache().expire(prefix)
+        return wrapper
+
+    return decorator
@@ -4,13 +4,22 @@ Reddit Impact Analysis
 Correlates Reddit posts/comments with PostHog DAU metrics
 """
 
+import argparse
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import plotly.io as pio
+from dateutil.tz import tzlocal
 from dotenv import load_dotenv
 from datagen_sdk import DatagenClient, DatagenError
+from disk_cache import disk_cached
 
 # Load environment variables
 load_dotenv()
@@ -19,57 +28,107 @@ load_dotenv()
 REDDIT_USERNAME = "AccurateSuggestion54"
 DATAGEN_API_KEY = os.getenv("DATAGEN_API_KEY")
 
+# Reddit listings return at most 100 items per page
+REDDIT_PAGE_SIZE = 100
+REDDIT_TIMEOUT = 10
+REDDIT_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; Python script)"}
 
-def fetch_reddit_activity(username, limit=100):
-    """Fetch Reddit posts and comments for a user"""
-    print(f"Fetching Reddit activity for u/{username}...")
+# First "data[N]: ..." / "labels[N]: ..." line of a PostHog trends result
+DAU_DATA_RE = re.compile(r'data\[\d*\]:[ \t]*([^\n]*)')
+DAU_LABELS_RE = re.compile(r'labels\[\d*\]:[ \t]*([^\n]*)')
+
+# orjson is already a dependency; use it for figure JSON rather than relying on plotly's "auto" probe
+pio.json.config.default_engine = "orjson"
+
+# Raw Reddit/PostHog responses are reused from the disk cache for a day (--refresh re-fetches)
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+
+def create_reddit_session():
+    """Create a keep-alive session that retries Reddit's rate-limit and server errors"""
+    session = requests.Session()
+    session.headers.update(REDDIT_HEADERS)
 
-    url = f"https://www.reddit.com/user/{username}.json?limit={limit}"
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; Python script)"}
+    retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+    return session
 
-    all_posts = []
 
-    while url:
-        response = requests.get(url, headers=headers)
+@disk_cached(ttl=RESPONSE_CACHE_TTL)
+def fetch_reddit_listing(username, limit):
+    """Fetch up to limit raw activities for a user, column-wise, following the listing cursor"""
+    url = f"https://www.reddit.com/user/{username}.json"
+    session = create_reddit_session()
+
+    columns = {
+        'kind': [], 'created_utc': [], 'title': [], 'subreddit': [],
+        'score': [], 'num_comments': [], 'permalink': []
+    }
+    after = None
+
+    # Each page needs the previous page's cursor, so pages are fetched in order;
+    # ask only for what is still missing so no page is larger than needed
+    while len(columns['kind']) < limit:
+        params = {"limit": min(REDDIT_PAGE_SIZE, limit - len(columns['kind']))}
+        if after:
+            params["after"] = after
+
+        response = session.get(url, params=params, timeout=REDDIT_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         for child in data['data']['children']:
             post_data = child['data']
-
-            # Determine if it's a post or comment
-            is_comment = child['kind'] == 't1'
-
-            activity = {
-                'type': 'comment' if is_comment else 'post',
-                'created_utc': post_data['created_utc'],
-                'created_date': datetime.fromtimestamp(post_data['created_utc']).strftime('%Y-%m-%d'),
-                'title': post_data.get('link_title') or post_data.get('title', ''),
-                'subreddit': post_data['subreddit'],
-                'score': post_data['score'],
-                'num_comments': post_data.get('num_comments', 0),
-                'url': f"https://reddit.com{post_data['permalink']}"
-            }
-            all_posts.append(activity)
+            columns['kind'].append(child['kind'])
+            columns['created_utc'].append(post_data['created_utc'])
+            columns['title'].append(post_data.get('link_title') or post_data.get('title', ''))
+            columns['subreddit'].append(post_data['subreddit'])
+            columns['score'].append(post_data['score'])
+            columns['num_comments'].append(post_data.get('num_comments', 0))
+            columns['permalink'].append(post_data['permalink'])
 
         # Pagination
         after = data['data'].get('after')
-        if after and len(all_posts) < limit:
-            url = f"https://www.reddit.com/user/{username}.json?after={after}&limit={limit}"
-        else:
-            url = None
+        if not after or not data['data']['children']:
+            break
 
-    print(f"✅ Found {len(all_posts)} Reddit activities")
-    return pd.DataFrame(all_posts)
+    return columns
 
 
-def fetch_posthog_dau(days=90):
-    """Fetch PostHog DAU data"""
-    print(f"\nFetching PostHog DAU for last {days} days...")
+def fetch_reddit_activity(username, limit=100, force_refresh=False):
+    """Fetch Reddit posts and comments for a user"""
+    print(f"Fetching Reddit activity for u/{username}...")
 
-    if not DATAGEN_API_KEY:
-        raise ValueError("DATAGEN_API_KEY not set")
+    if force_refresh:
+        fetch_reddit_listing.clear_disk_cache()
+    columns = fetch_reddit_listing(username, limit)
+
+    # Timestamps become local calendar dates, as datetime.fromtimestamp would give
+    created_utc = np.asarray(columns['created_utc'])
+    created_date = (
+        pd.to_datetime(created_utc, unit='s', utc=True).tz_convert(tzlocal()).strftime('%Y-%m-%d')
+    )
+
+    # Repeated labels are stored as categoricals, so masks and groupbys compare codes
+    reddit_df = pd.DataFrame({
+        # "t1" is a comment; everything else in a user listing is a post
+        'type': pd.Categorical(np.where(np.asarray(columns['kind']) == 't1', 'comment', 'post'), categories=['post', 'comment']),
+        'created_utc': created_utc,
+        'created_date': pd.Categorical(created_date),
+        'title': columns['title'],
+        'subreddit': pd.Categorical(columns['subreddit']),
+        'score': np.asarray(columns['score'], dtype=np.int32),
+        'num_comments': np.asarray(columns['num_comments'], dtype=np.int32),
+        'url': ["https://reddit.com" + permalink for permalink in columns['permalink']]
+    })
 
+    print(f"✅ Found {len(reddit_df)} Reddit activities")
+    return reddit_df
+
+
+@disk_cached(ttl=RESPONSE_CACHE_TTL)
+def query_posthog_dau(days):
+    """Run the daily DAU trends query and return the raw tool result, or None if it is empty"""
     client = DatagenClient(api_key=DATAGEN_API_KEY)
 
     query = {
@@ -91,7 +150,19 @@ def fetch_posthog_dau(days=90):
         }
     }
 
-    result = client.execute_tool("mcp_Posthog_query_run", {"query": query})
+    return client.execute_tool("mcp_Posthog_query_run", {"query": query}) or None
+
+
+def fetch_posthog_dau(days=90, force_refresh=False):
+    """Fetch PostHog DAU data"""
+    print(f"\nFetching PostHog DAU for last {days} days...")
+
+    if not DATAGEN_API_KEY:
+        raise ValueError("DATAGEN_API_KEY not set")
+
+    if force_refresh:
+        query_posthog_dau.clear_disk_cache()
+    result = query_posthog_dau(days)
 
     # Parse the result
     if not result or not isinstance(result, list) or len(result) == 0:
@@ -99,24 +170,20 @@ def fetch_posthog_dau(days=90):
 
     data_str = result[0]
 
-    # Extract DAU values
-    dau_line = [line for line in data_str.split('\n') if 'data[' in line][0]
-    dau_values = dau_line.split(']:')[1].split('\n')[0].strip().split(',')
-    dau_values = [int(x) for x in dau_values if x.strip().isdigit()]
-
-    # Extract labels
-    labels_line = [line for line in data_str.split('\n') if 'labels[' in line][0]
-    labels_raw = labels_line.split(']:')[1].split('\n')[0].strip().split(',')
-
-    # Convert PostHog date format (e.g., "20-Nov-2025") to YYYY-MM-DD
-    labels = []
-    for label in labels_raw:
-        try:
-            # Parse PostHog date format
-            date_obj = datetime.strptime(label.strip(), '%d-%b-%Y')
-            labels.append(date_obj.strftime('%Y-%m-%d'))
-        except:
-            labels.append(label.strip())
+    # Extract DAU values and labels
+    dau_match = DAU_DATA_RE.search(data_str)
+    labels_match = DAU_LABELS_RE.search(data_str)
+    if dau_match is None or labels_match is None:
+        raise ValueError("No DAU data returned")
+
+    # Days without a numeric count (e.g. null) are counted as 0
+    dau_tokens = pd.Series(dau_match.group(1).split(','), dtype=object).str.strip()
+    dau_values = pd.to_numeric(dau_tokens, errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    labels_raw = np.char.strip(labels_match.group(1).strip().split(','))
+
+    # Convert PostHog date format (e.g., "20-Nov-2025") to YYYY-MM-DD, keeping unparseable labels
+    parsed = pd.to_datetime(labels_raw, format='%d-%b-%Y', errors='coerce')
+    labels = np.where(parsed.isna(), labels_raw, parsed.strftime('%Y-%m-%d'))
 
     df = pd.DataFrame({
         'date': labels,
@@ -130,19 +197,21 @@ def fetch_posthog_dau(days=90):
 def aggregate_reddit_by_date(reddit_df):
     """Aggregate Reddit activity by date"""
     if reddit_df.empty:
-        return pd.DataFrame(columns=['date', 'post_count', 'comment_count', 'total_score'])
-
-    # Group by date
-    daily = reddit_df.groupby('created_date').agg({
-        'type': lambda x: (x == 'post').sum(),
-        'score': 'sum'
-    }).reset_index()
-
-    daily.columns = ['date', 'post_count', 'total_score']
-
-    # Add comment count
-    comment_counts = reddit_df[reddit_df['type'] == 'comment'].groupby('created_date').size()
-    daily['comment_count'] = daily['date'].map(comment_counts).fillna(0).astype(int)
+        return pd.DataFrame(columns=['date', 'post_count', 'comment_count', 'total_score']).astype(
+            {'post_count': np.int32, 'comment_count': np.int32, 'total_score': np.int32}
+        )
+
+    # One pass over integer-coded dates instead of per-group lambdas; daily counts fit in int32
+    codes, dates = pd.factorize(reddit_df['created_date'], sort=True)
+    is_post = reddit_df['type'].eq('post').to_numpy()
+    is_comment = reddit_df['type'].eq('comment').to_numpy()
+
+    daily = pd.DataFrame({
+        'date': np.asarray(dates, dtype=object),
+        'post_count': np.bincount(codes, weights=is_post).astype(np.int32),
+        'total_score': np.bincount(codes, weights=reddit_df['score'].to_numpy()).astype(np.int32),
+        'comment_count': np.bincount(codes, weights=is_comment).astype(np.int32)
+    })
 
     return daily
 
@@ -154,11 +223,20 @@ def create_overlay_visualization(posthog_df, reddit_df):
     # Aggregate Reddit data by date
     reddit_daily = aggregate_reddit_by_date(reddit_df)
 
-    # Merge datasets
-    merged = posthog_df.merge(reddit_daily, on='date', how='left')
-    merged['post_count'] = merged['post_count'].fillna(0).astype(int)
-    merged['comment_count'] = merged['comment_count'].fillna(0).astype(int)
-    merged['total_score'] = merged['total_score'].fillna(0).astype(int)
+    # Align the daily Reddit counts to the DAU dates (days without activity count as 0)
+    # and derive the total activity in the same int32 buffer
+    rows = pd.Index(reddit_daily['date']).get_indexer(posthog_df['date'])
+    found = rows >= 0
+    activity = np.zeros((len(posthog_df), 4), dtype=np.int32)
+    activity[found, :3] = reddit_daily[['post_count', 'comment_count', 'total_score']].to_numpy()[rows[found]]
+    activity[:, 3] = activity[:, 0] + activity[:, 1]
+    # Columns keep the order of the exported CSV
+    merged = posthog_df.assign(
+        post_count=activity[:, 0],
+        total_score=activity[:, 2],
+        comment_count=activity[:, 1],
+        total_reddit_activity=activity[:, 3]
+    )
 
     # Create figure with secondary y-axis
     fig = go.Figure()
@@ -196,13 +274,11 @@ def create_overlay_visualization(posthog_df, reddit_df):
         title=f'Reddit Activity Impact on DAU<br><sub>User: u/{REDDIT_USERNAME}</sub>',
         xaxis=dict(title='Date', tickangle=-45),
         yaxis=dict(
-            title='Daily Active Users (DAU)',
-            titlefont=dict(color='#0045AC'),
+            title=dict(text='Daily Active Users (DAU)', font=dict(color='#0045AC')),
             tickfont=dict(color='#0045AC')
         ),
         yaxis2=dict(
-            title='Reddit Activity Count',
-            titlefont=dict(color='#FF4500'),
+            title=dict(text='Reddit Activity Count', font=dict(color='#FF4500')),
             tickfont=dict(color='#FF4500'),
             overlaying='y',
             side='right'
@@ -220,13 +296,12 @@ def calculate_correlation(merged_df):
     """Calculate correlation between Reddit activity and DAU"""
     print("\nCalculating correlations...")
 
-    # Calculate total Reddit activity
-    merged_df['total_reddit_activity'] = merged_df['post_count'] + merged_df['comment_count']
-
-    # Calculate correlations
-    post_corr = merged_df[['dau', 'post_count']].corr().iloc[0, 1]
-    comment_corr = merged_df[['dau', 'comment_count']].corr().iloc[0, 1]
-    total_corr = merged_df[['dau', 'total_reddit_activity']].corr().iloc[0, 1]
+    # Calculate correlations (NaN when a series is constant, as with DataFrame.corr)
+    # One correlation matrix shares the means/deviations across all three pairs
+    activity = merged_df[['dau', 'post_count', 'comment_count', 'total_reddit_activity']].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = np.corrcoef(activity, rowvar=False)
+    post_corr, comment_corr, total_corr = (float(c) for c in corr[0, 1:])
 
     print(f"\n📊 Correlation Analysis:")
     print(f"   Posts vs DAU: {post_corr:.3f}")
@@ -254,35 +329,43 @@ def find_impact_moments(merged_df, reddit_df):
     # Sort by total score
     active_days = active_days.sort_values('total_score', ascending=False)
 
+    # Group the activities by day once instead of scanning reddit_df per day
+    activities_by_date = dict(tuple(reddit_df.groupby('created_date', sort=False, observed=True)))
+
     # Show top 5 impactful days
-    for idx, row in active_days.head(5).iterrows():
-        date = row['date']
-        dau = int(row['dau'])
-        posts = int(row['post_count'])
-        comments = int(row['comment_count'])
-        score = int(row['total_score'])
+    for row in active_days.head(5).itertuples(index=False):
+        date = row.date
+        dau = int(row.dau)
+        posts = int(row.post_count)
+        comments = int(row.comment_count)
+        score = int(row.total_score)
 
         print(f"\n   📅 {date}:")
         print(f"      DAU: {dau:,}")
         print(f"      Reddit: {posts} posts, {comments} comments (score: {score})")
 
         # Find the actual posts from that day
-        day_posts = reddit_df[reddit_df['created_date'] == date]
-        for _, post in day_posts.head(2).iterrows():
-            print(f"      - {post['type']}: {post['title'][:60]}... (+{post['score']})")
+        day_posts = activities_by_date.get(date)
+        if day_posts is None:
+            continue
+        for post in day_posts.head(2).itertuples(index=False):
+            print(f"      - {post.type}: {post.title[:60]}... (+{post.score})")
 
 
-def main():
+def main(force_refresh=False):
     print("=" * 60)
     print("Reddit Impact Analysis on PostHog DAU")
     print("=" * 60)
 
     try:
-        # Fetch Reddit data
-        reddit_df = fetch_reddit_activity(REDDIT_USERNAME, limit=100)
-
-        # Fetch PostHog DAU data
-        posthog_df = fetch_posthog_dau(days=90)
+        # Fetch Reddit and PostHog DAU data concurrently; they are independent round-trips
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            reddit_future = executor.submit(
+                fetch_reddit_activity, REDDIT_USERNAME, limit=100, force_refresh=force_refresh
+            )
+            posthog_future = executor.submit(fetch_posthog_dau, days=90, force_refresh=force_refresh)
+            reddit_df = reddit_future.result()
+            posthog_df = posthog_future.result()
 
         # Create visualization
         fig, merged_df = create_overlay_visualization(posthog_df, reddit_df)
@@ -295,7 +378,8 @@ def main():
 
         # Save visualization
         output_file = "reddit_impact_analysis.html"
-        fig.write_html(output_file)
+        # Load plotly.js from the CDN instead of inlining the ~3 MB bundle in every report
+        fig.write_html(output_file, include_plotlyjs='cdn', validate=False)
         print(f"\n✅ Visualization saved to: {output_file}")
 
         # Save data
@@ -312,4 +396,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Correlate Reddit activity with PostHog DAU")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached Reddit/PostHog responses")
+    main(force_refresh=parser.parse_args().refresh)
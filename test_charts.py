@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Regression checks for the dashboard's chart downsampling
+Compares lttb_indices with a straightforward reference LTTB
+"""
+
+import numpy as np
+
+from app import lttb_indices
+
+
+def reference_lttb(values, n_out):
+    """Textbook Largest-Triangle-Three-Buckets, one bucket at a time"""
+    n = len(values)
+    if n <= n_out:
+        return list(range(n))
+    if n_out < 3:
+        return [0, n - 1]
+
+    # Bucket i starts at edge(i); exact integer bounds avoid float rounding at bucket edges
+    def edge(i):
+        return 1 + i * (n - 2) // (n_out - 2)
+
+    indices = [0]
+    a = 0
+    for i in range(n_out - 2):
+        # Mean of the next bucket (just the last point for the final bucket)
+        avg_start = edge(i + 1)
+        avg_end = min(edge(i + 2), n)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = None, -1.0
+        for j in range(edge(i), edge(i + 1)):
+            area = abs((a - avg_x) * (values[j] - values[a]) - (a - j) * (avg_y - values[a]))
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        a = best
+
+    indices.append(n - 1)
+    return indices
+
+
+def check(values, n_out):
+    """Assert the invariants for one series and compare with the reference"""
+    indices = lttb_indices(values, n_out)
+    n = len(values)
+
+    assert len(indices) == min(n, max(n_out, 2)), (n, n_out, len(indices))
+    assert indices[0] == 0 and indices[-1] == n - 1, (n, n_out)
+    assert np.all(np.diff(indices) > 0), (n, n_out)
+    assert list(indices) == reference_lttb(list(values), n_out), (n, n_out)
+
+
+def test_short_series_is_kept():
+    """n_out >= len returns every index"""
+    for n in (1, 2, 5, 100):
+        values = np.arange(n, dtype=float)
+        assert list(lttb_indices(values, n)) == list(range(n))
+        assert list(lttb_indices(values, n + 10)) == list(range(n))
+
+
+def test_smallest_outputs():
+    """n_out of 2 keeps only the end points; 3 adds the single largest triangle"""
+    values = [0.0, 1.0, 9.0, 2.0, 3.0, 1.0]
+    assert list(lttb_indices(values, 2)) == [0, 5]
+    assert list(lttb_indices(values, 3)) == [0, 2, 5]
+    check(values, 2)
+    check(values, 3)
+
+
+def test_matches_reference():
+    """First/last kept, strictly increasing and identical to the reference on random series"""
+    rng = np.random.default_rng(0)
+    for n in (4, 10, 101, 1000, 5003):
+        values = rng.normal(size=n).cumsum()
+        for n_out in (3, 4, 7, 50, n - 1):
+            if n_out < n:
+                check(values, n_out)
+
+
+def main():
+    """Run the regression checks"""
+    print("=" * 50)
+    print("Chart Downsampling Checks")
+    print("=" * 50)
+
+    for test in (test_short_series_is_kept, test_smallest_outputs, test_matches_reference):
+        test()
+        print(f"✅ {test.__doc__}")
+
+    print("\n🎉 All checks passed!")
+
+
+if __name__ == "__main__":
+    main()